@@ -16,10 +16,15 @@ This script handles:
   • Rate Sheet / Main index / empty sheets → skipped
 """
 
+import itertools
 import json
+import multiprocessing
+import multiprocessing.util
 import os
 import re
 import sys
+from collections import Counter
+from functools import lru_cache
 import openpyxl
 
 # ── Paths ─────────────────────────────────────────────────────────────────────
@@ -30,8 +35,6 @@ XLSX_PATH   = os.path.join(PROJECT_DIR, "NUST Bank-Product-Knowledge.xlsx")
 if PROJECT_DIR not in sys.path:
     sys.path.insert(0, PROJECT_DIR)
 
-from src.data_pipeline import ingest_new_qa_pairs
-
 OUT_JSONL_INSTRUCT = os.path.join(SCRIPT_DIR, "finetuning_data.jsonl")
 OUT_JSONL_CHAT     = os.path.join(SCRIPT_DIR, "finetuning_data_chat.jsonl")
 OUT_JSON_ALL       = os.path.join(SCRIPT_DIR, "all_qa_pairs.json")
@@ -64,65 +67,49 @@ Rules:
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+# Compiled once at import – these run on every text cell of every sheet
+_WS_RE = re.compile(r"[^\S\n]+")
+_NL_RE = re.compile(r"\n{3,}")
+# Common question openers, incl. numbered questions like "1.What are..."
+_Q_START_RE = re.compile(
+    r"(?:what|how|does|which|who|where|when|why"
+    r"|i would like to|i want to|please tell"
+    r"|(?:is|can)[ \n]|do |are "
+    r"|1\.|1 \.|1-)",
+    re.IGNORECASE,
+)
+
+
 def clean_text(text: str) -> str:
     """Normalise whitespace, strip, and collapse blank lines."""
     if not text:
         return ""
     text = text.strip()
-    # Replace tabs with spaces
-    text = text.replace("\t", " ")
-    # Collapse multiple spaces (but keep newlines meaningful)
-    text = re.sub(r"[^\S\n]+", " ", text)
+    # Collapse runs of spaces/tabs (but keep newlines meaningful)
+    text = _WS_RE.sub(" ", text)
     # Collapse 3+ newlines into 2
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _NL_RE.sub("\n\n", text)
     return text.strip()
 
 
+@lru_cache(maxsize=4096)
 def is_question(text: str) -> bool:
     """Heuristic: does this text look like a question?"""
     t = text.strip()
-    if not t:
-        return False
-    # Ends with question mark
-    if t.endswith("?"):
-        return True
-    # Starts with common question patterns
-    q_starts = (
-        "what", "how", "is ", "is\n", "can ", "can\n", "does", "do ",
-        "are ", "which", "who", "where", "when", "why",
-        "i would like to", "i want to", "please tell",
-        "1.", "1 .", "1-",  # numbered questions like "1.What are..."
-    )
-    lower = t.lower()
-    for qs in q_starts:
-        if lower.startswith(qs):
-            return True
-    # Contains a question mark anywhere (sometimes merged text)
-    if "?" in t[:80]:
-        return True
-    return False
-
-
-def get_all_cell_values(ws):
+    # Ends with a question mark, starts with a common question pattern,
+    # or contains a question mark early on (sometimes merged text)
+    return bool(t) and (t.endswith("?") or "?" in t[:80] or _Q_START_RE.match(t) is not None)
+
+
+def is_empty_sheet(ws) -> bool:
     """
-    Return a list of (row_idx, col_letter, value_str) for every non-empty,
-    non-formula cell in the worksheet.
+    True if the sheet cannot hold any Q&A (at most a title row).
+    Uses the stored dimensions when the file has them; otherwise peeks for
+    a second row instead of parsing the whole sheet.
     """
-    results = []
-    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=False):
-        for cell in row:
-            if cell.value is None:
-                continue
-            val = str(cell.value).strip()
-            # Skip Excel formula references
-            if val.startswith("="):
-                continue
-            if val.lower() == "main":
-                continue
-            if not val:
-                continue
-            results.append((cell.row, cell.column_letter, val))
-    return results
+    if ws.max_row is not None:
+        return ws.max_row <= 1
+    return next(itertools.islice(ws.iter_rows(values_only=True), 1, None), None) is None
 
 
 def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
@@ -130,61 +117,53 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
     Walk through a sheet, detect question rows and their answers.
     Returns a list of {"question": ..., "answer": ..., "product": ...}
     """
-    # Get product name from first row
     product_name = sheet_name  # fallback
-    for row in ws.iter_rows(min_row=1, max_row=1, values_only=False):
-        for cell in row:
-            if cell.value and not str(cell.value).strip().lower() == "main":
-                val = str(cell.value).strip()
-                if not val.startswith("="):
-                    product_name = val
-                    break
-
-    # Collect all non-empty text cells, grouped by row
-    rows_data = {}  # row_num -> list of text values
-    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, values_only=False):
-        row_texts = []
-        for cell in row:
-            if cell.value is None:
+    title_checked = False
+
+    # Single pass: rows arrive in ascending order, so each one is fed
+    # straight into the Q&A state machine below
+    qa_pairs = []
+    current_question = None
+    current_answer_parts = []
+
+    row_texts = []  # reused across rows; joined before the next clear()
+    for r_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        row_texts.clear()
+        for value in row:
+            if value is None:
                 continue
-            val = str(cell.value).strip()
-            if val.startswith("=") or val.lower() == "main" or not val:
+            val = str(value).strip()
+            # Only 4-character cells can be "main", so most skip the lower()
+            if not val or val[0] == "=" or (len(val) == 4 and val.lower() == "main"):
                 continue
             row_texts.append(val)
-        if row_texts:
-            # Combine all cell values in the row into one string
-            combined = " | ".join(row_texts) if len(row_texts) > 1 else row_texts[0]
-            rows_data[row.row if hasattr(row, 'row') else row[0].row] = combined
-
-    if not rows_data:
-        return []
+        if not row_texts:
+            continue
 
-    # Sort by row number
-    sorted_rows = sorted(rows_data.items())
+        # Get product name from first row
+        if r_idx == 1:
+            product_name = row_texts[0]
 
-    # Skip the first row if it's just the product title
-    start_idx = 0
-    if sorted_rows and sorted_rows[0][1].strip() == product_name.strip():
-        start_idx = 1
+        # Combine all cell values in the row into one string
+        combined = " | ".join(row_texts)
 
-    # Now walk through rows detecting Q&A pairs
-    qa_pairs = []
-    current_question = None
-    current_answer_parts = []
+        # Skip the first non-empty row if it's just the product title
+        if not title_checked:
+            title_checked = True
+            if combined.strip() == product_name.strip():
+                continue
 
-    for row_num, text in sorted_rows[start_idx:]:
-        text = clean_text(text)
+        text = clean_text(combined)
         if not text:
             continue
 
         if is_question(text):
-            # Save previous Q&A if exists
+            # Save previous Q&A if exists (question and parts are already cleaned)
             if current_question and current_answer_parts:
                 answer = "\n".join(current_answer_parts)
-                answer = clean_text(answer)
                 if answer:
                     qa_pairs.append({
-                        "question": clean_text(current_question),
+                        "question": current_question,
                         "answer": answer,
                         "product": product_name,
                         "sheet": sheet_name,
@@ -206,10 +185,9 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
     # Don't forget the last Q&A
     if current_question and current_answer_parts:
         answer = "\n".join(current_answer_parts)
-        answer = clean_text(answer)
         if answer:
             qa_pairs.append({
-                "question": clean_text(current_question),
+                "question": current_question,
                 "answer": answer,
                 "product": product_name,
                 "sheet": sheet_name,
@@ -218,23 +196,65 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
     return qa_pairs
 
 
+# ── Workers ───────────────────────────────────────────────────────────────────
+
+# Each pool worker opens the workbook once and reuses it for every sheet
+# it is handed (title -> worksheet, so no wb[...] scan per sheet)
+_worker_sheets = {}
+
+
+def _init_worker():
+    global _worker_sheets
+    wb = openpyxl.load_workbook(XLSX_PATH, data_only=True, read_only=True)
+    _worker_sheets = {ws.title: ws for ws in wb.worksheets}
+    # Runs when the worker exits normally (after pool.close() / join())
+    multiprocessing.util.Finalize(None, wb.close, exitpriority=10)
+
+
+def _process_sheet(sheet_name: str) -> list[dict]:
+    """Extract the Q&A pairs of one sheet inside a pool worker."""
+    return extract_qa_from_sheet(_worker_sheets[sheet_name], sheet_name)
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
-    wb = openpyxl.load_workbook(XLSX_PATH, data_only=True)
+    # Imported here rather than at module level so pool workers don't pay
+    # for the embedding / vector store stack they never use
+    from src.data_pipeline import ingest_new_qa_pairs
+
+    # read_only streams the sheet XML lazily and skips style bookkeeping
+    wb = openpyxl.load_workbook(XLSX_PATH, data_only=True, read_only=True)
 
-    all_qa = []
     skipped = []
+    sheets = []
 
-    for sheet_name in wb.sheetnames:
-        if sheet_name in SKIP_SHEETS:
-            skipped.append(sheet_name)
+    for ws in wb.worksheets:
+        if ws.title in SKIP_SHEETS or is_empty_sheet(ws):
+            skipped.append(ws.title)
             continue
-
-        ws = wb[sheet_name]
-        pairs = extract_qa_from_sheet(ws, sheet_name)
-        all_qa.extend(pairs)
+        sheets.append(ws)
+    sheet_names = [ws.title for ws in sheets]
+
+    # Sheets are independent and parsing is CPU-bound, so fan them out
+    # across processes – but never more workers than sheets, since each
+    # one re-loads the workbook
+    n_procs = min(len(sheets), os.cpu_count() or 1)
+    if n_procs > 1:
+        wb.close()
+        with multiprocessing.Pool(n_procs, initializer=_init_worker) as pool:
+            results = pool.map(_process_sheet, sheet_names)
+            # Let workers exit normally so their workbooks get closed
+            pool.close()
+            pool.join()
+    else:
+        # A single worker would only re-load the workbook already open here
+        results = [extract_qa_from_sheet(ws, ws.title) for ws in sheets]
+        wb.close()
+
+    for sheet_name, pairs in zip(sheet_names, results):
         print(f"  ✓ {sheet_name:25s} → {len(pairs):3d} Q&A pairs")
+    all_qa = list(itertools.chain.from_iterable(results))
 
     print(f"\nSkipped sheets: {skipped}")
     print(f"Total Q&A pairs extracted: {len(all_qa)}")
@@ -264,15 +284,12 @@ def main():
     print(f"✅ Updated chat JSONL         → {OUT_JSONL_CHAT}")
 
     # ── Summary stats ─────────────────────────────────────────────────────────
-    products = {}
-    for qa in all_qa:
-        products.setdefault(qa["product"], 0)
-        products[qa["product"]] += 1
+    products = Counter(qa["product"] for qa in all_qa)
 
     print(f"\n{'─'*60}")
     print(f"{'PRODUCT':<45} {'Q&A COUNT':>10}")
     print(f"{'─'*60}")
-    for prod, count in sorted(products.items(), key=lambda x: -x[1]):
+    for prod, count in products.most_common():
         print(f"  {prod:<43} {count:>10}")
     print(f"{'─'*60}")
     print(f"  {'TOTAL':<43} {len(all_qa):>10}")
@@ -1,62 +1,148 @@
 """
 Inspect all sheets/tabs in the NUST Bank-Product-Knowledge.xlsx file.
-Prints: sheet names, shape, columns, dtypes, nulls, and first few rows per sheet.
+Prints: sheet names, shape, columns, value types, nulls, and first few rows per sheet.
+
+Each sheet is streamed once in openpyxl read-only mode, so memory stays
+proportional to the number of columns rather than the size of the sheet.
 """
 
-import pandas as pd
 import os
+from collections import Counter, deque
+
+import openpyxl
 
 XLSX_PATH = os.path.join(os.path.dirname(__file__), "..", "NUST Bank-Product-Knowledge.xlsx")
 
+UNIQUE_CAP    = 10_000  # stop tracking distinct values per column beyond this
+PREVIEW_WIDTH = 60      # max characters shown per cell in row previews
+
+
+def column_names(header, n_cols):
+    """Header labels in the same style as pandas ("Unnamed: 3", "Name.1")."""
+    names = []
+    seen = Counter()
+    for i in range(n_cols):
+        value = header[i] if i < len(header) else None
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if seen[name]:
+            label = f"{name}.{seen[name]}"
+        else:
+            label = name
+        seen[name] += 1
+        names.append(label)
+    return names
+
+
+def print_rows(columns, rows):
+    def fmt(value):
+        text = "NaN" if value is None else str(value).replace("\n", " ")
+        return text if len(text) <= PREVIEW_WIDTH else text[:PREVIEW_WIDTH - 3] + "..."
+
+    print("    " + " | ".join(fmt(c) for c in columns))
+    for row in rows:
+        print("    " + " | ".join(fmt(row[i] if i < len(row) else None) for i in range(len(columns))))
+
+
 # ── Load every sheet ──────────────────────────────────────────────────────────
-xls = pd.ExcelFile(XLSX_PATH, engine="openpyxl")
+wb = openpyxl.load_workbook(XLSX_PATH, read_only=True, data_only=True)
 
 print("=" * 80)
 print(f"FILE : {os.path.basename(XLSX_PATH)}")
-print(f"TOTAL SHEETS : {len(xls.sheet_names)}")
-print(f"SHEET NAMES  : {xls.sheet_names}")
+print(f"TOTAL SHEETS : {len(wb.sheetnames)}")
+print(f"SHEET NAMES  : {wb.sheetnames}")
 print("=" * 80)
 
-for sheet in xls.sheet_names:
-    df = pd.read_excel(xls, sheet_name=sheet)
+for ws in wb.worksheets:
+    # Single pass: the first row is the header, empty strings count as
+    # missing, trailing empty cells are trimmed and trailing blank rows
+    # dropped (as read_excel does)
+    header = None
+    n_rows = 0
+    pending_blank = 0  # blank rows only count once a later row has data
+    type_counts = []  # per column: type name -> count
+    non_null = []
+    uniques = []
+    head = []
+    tail = deque(maxlen=2)
+
+    for row in ws.iter_rows(values_only=True):
+        width = len(row)
+        while width and row[width - 1] in (None, ""):
+            width -= 1
+        row = row[:width]
+
+        if header is None:
+            header = row
+            continue
+        if not width:
+            pending_blank += 1
+            continue
+
+        for kept in [()] * pending_blank + [row]:
+            n_rows += 1
+            if len(head) < 5:
+                head.append(kept)
+            tail.append(kept)
+        pending_blank = 0
+
+        while len(non_null) < width:
+            type_counts.append(Counter())
+            non_null.append(0)
+            uniques.append(set())
+        for i, value in enumerate(row):
+            if value is None or value == "":
+                continue
+            non_null[i] += 1
+            type_counts[i][type(value).__name__] += 1
+            if len(uniques[i]) < UNIQUE_CAP:
+                uniques[i].add(value)
+
+    n_cols = max(len(header or ()), len(non_null))
+    while len(non_null) < n_cols:
+        type_counts.append(Counter())
+        non_null.append(0)
+        uniques.append(set())
+    columns = column_names(header or (), n_cols)
 
     print(f"\n{'─' * 80}")
-    print(f"SHEET: {sheet}")
+    print(f"SHEET: {ws.title}")
     print(f"{'─' * 80}")
-    print(f"  Rows x Cols : {df.shape[0]} rows  x  {df.shape[1]} cols")
-    print(f"  Columns     : {list(df.columns)}")
+    print(f"  Rows x Cols : {n_rows} rows  x  {n_cols} cols")
+    print(f"  Columns     : {columns}")
     print()
 
-    # Data types
-    print("  DATA TYPES:")
-    for col in df.columns:
-        print(f"    {col:40s}  ->  {df[col].dtype}")
+    # Value types
+    print("  VALUE TYPES:")
+    for col, counts in zip(columns, type_counts):
+        types = ", ".join(f"{name} ({n})" for name, n in counts.most_common()) or "empty"
+        print(f"    {col:40s}  ->  {types}")
     print()
 
     # Null counts
     print("  NULL / MISSING VALUES:")
-    for col in df.columns:
-        n = df[col].isna().sum()
-        pct = n / len(df) * 100 if len(df) > 0 else 0
+    for col, present in zip(columns, non_null):
+        n = n_rows - present
+        pct = n / n_rows * 100 if n_rows > 0 else 0
         print(f"    {col:40s}  ->  {n:>5}  ({pct:.1f}%)")
     print()
 
     # Unique counts
     print("  UNIQUE VALUES:")
-    for col in df.columns:
-        print(f"    {col:40s}  ->  {df[col].nunique()}")
+    for col, values in zip(columns, uniques):
+        n_unique = f"{UNIQUE_CAP}+" if len(values) >= UNIQUE_CAP else len(values)
+        print(f"    {col:40s}  ->  {n_unique}")
     print()
 
     # Preview first 5 rows
     print("  FIRST 5 ROWS:")
-    with pd.option_context("display.max_columns", None, "display.width", 200, "display.max_colwidth", 60):
-        print(df.head().to_string(index=False))
+    print_rows(columns, head)
     print()
 
     # Preview last 2 rows
     print("  LAST 2 ROWS:")
-    with pd.option_context("display.max_columns", None, "display.width", 200, "display.max_colwidth", 60):
-        print(df.tail(2).to_string(index=False))
+    print_rows(columns, tail)
+
+wb.close()
 
 print("\n" + "=" * 80)
 print("INSPECTION COMPLETE")
@@ -15,6 +15,11 @@ from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
 from sentence_transformers import SentenceTransformer
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder when orjson is unavailable.
+    orjson = None
+
 SRC_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SRC_DIR.parent
 
@@ -57,12 +62,20 @@ CHUNK_METADATA_PATH = DATA_DIR / "chunk_metadata.json"
 RAW_FAISS_INDEX_PATH = DATA_DIR / "faiss_index.bin"
 VECTORSTORE_DIR = DATA_DIR / "vectorstore"
 
+# Common question openers in a single alternation, so each text is matched once.
+QUESTION_START_RE = re.compile(
+    r"(?:what|how|does|which|who|where|when|why"
+    r"|i would like to|i want to|please tell"
+    r"|(?:is|can)[ \n]|do |are "
+    r"|1\.|1 \.|1-)",
+    re.IGNORECASE,
+)
+
 
 def clean_text(text: str) -> str:
     if not text:
         return ""
-    text = text.strip().replace("\t", " ")
-    text = re.sub(r"[^\S\n]+", " ", text)
+    text = re.sub(r"[^\S\n]+", " ", text.strip())
     text = re.sub(r"\n{3,}", "\n\n", text)
     return text.strip()
 
@@ -103,34 +116,18 @@ def normalize_text(text: str) -> str:
 
 def is_question(text: str) -> bool:
     t = text.strip()
-    if not t:
-        return False
-    if t.endswith("?"):
-        return True
-    q_starts = (
-        "what", "how", "is ", "is\n", "can ", "can\n", "does", "do ",
-        "are ", "which", "who", "where", "when", "why",
-        "i would like to", "i want to", "please tell",
-        "1.", "1 .", "1-",
-    )
-    lower = t.lower()
-    for qs in q_starts:
-        if lower.startswith(qs):
-            return True
-    if "?" in t[:80]:
-        return True
-    return False
+    return bool(t) and (t.endswith("?") or "?" in t[:80] or QUESTION_START_RE.match(t) is not None)
 
 
 def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
     product_name = sheet_name
-    for row in ws.iter_rows(min_row=1, max_row=1, values_only=False):
-        for cell in row:
-            if cell.value and not str(cell.value).strip().lower() == "main":
-                val = str(cell.value).strip()
-                if not val.startswith("="):
-                    product_name = val
-                    break
+    for col_idx in range(1, (ws.max_column or 1) + 1):
+        value = ws.cell(row=1, column=col_idx).value
+        if value and not str(value).strip().lower() == "main":
+            val = str(value).strip()
+            if not val.startswith("="):
+                product_name = val
+                break
 
     # First try tabular extraction (Question/Answer columns), which is common in FAQ workbooks.
     header_row_idx = None
@@ -198,7 +195,8 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
     if not rows_data:
         return []
 
-    sorted_rows = sorted(rows_data.items())
+    # iter_rows yields rows in ascending order and dicts keep insertion order.
+    sorted_rows = list(rows_data.items())
     start_idx = 0
     if sorted_rows and sorted_rows[0][1].strip() == product_name.strip():
         start_idx = 1
@@ -214,10 +212,10 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
 
         if is_question(text):
             if current_question and current_answer_parts:
-                answer = clean_text("\n".join(current_answer_parts))
+                answer = "\n".join(current_answer_parts)
                 if answer:
                     qa_pairs.append({
-                        "question": clean_text(current_question),
+                        "question": current_question,
                         "answer": answer,
                         "product": product_name,
                         "sheet": sheet_name,
@@ -228,10 +226,10 @@ def extract_qa_from_sheet(ws, sheet_name: str) -> list[dict]:
             current_answer_parts.append(text)
 
     if current_question and current_answer_parts:
-        answer = clean_text("\n".join(current_answer_parts))
+        answer = "\n".join(current_answer_parts)
         if answer:
             qa_pairs.append({
-                "question": clean_text(current_question),
+                "question": current_question,
                 "answer": answer,
                 "product": product_name,
                 "sheet": sheet_name,
@@ -262,19 +260,57 @@ def load_json_list(path: Path) -> list[dict]:
 
 def save_json_list(path: Path, data: list[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
-def append_jsonl_records(path: Path, records: Iterable[dict]) -> int:
-    records = list(records)
-    if not records:
+def encode_json(value: object) -> bytes:
+    # Compact separators in the fallback so both encoders append the same line format.
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _chat_record_fragments() -> tuple[bytes, bytes, bytes]:
+    # Encode a template record with placeholder contents and cut it around them, so the
+    # fixed fragments always use the same encoder and separators as encode_json.
+    user_marker, assistant_marker = "\x00user\x00", "\x00assistant\x00"
+    template = encode_json(
+        {
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_marker},
+                {"role": "assistant", "content": assistant_marker},
+            ]
+        }
+    )
+    prefix, rest = template.split(encode_json(user_marker))
+    middle, suffix = rest.split(encode_json(assistant_marker))
+    return prefix, middle, suffix
+
+
+# Every chat record shares the same system message, so its JSON is encoded once
+# and only the user/assistant contents are serialised per record.
+CHAT_RECORD_PREFIX, CHAT_RECORD_MIDDLE, CHAT_RECORD_SUFFIX = _chat_record_fragments()
+
+
+def encode_chat_line(question: str, answer: str) -> bytes:
+    return b"".join(
+        (CHAT_RECORD_PREFIX, encode_json(question), CHAT_RECORD_MIDDLE, encode_json(answer), CHAT_RECORD_SUFFIX)
+    )
+
+
+def append_jsonl_lines(path: Path, lines: list[bytes]) -> int:
+    if not lines:
         return 0
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        for record in records:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-    return len(records)
+    with open(path, "ab") as f:
+        f.write(b"\n".join(lines) + b"\n")
+    return len(lines)
 
 
 def canonicalize_qa_pair(
@@ -348,31 +384,23 @@ def append_training_files(new_pairs: Iterable[dict]) -> dict:
     updated_pairs = existing_pairs + appended_pairs
     save_json_list(ALL_QA_PATH, updated_pairs)
 
-    append_jsonl_records(
-        FINETUNE_INSTRUCT_PATH,
-        (
-            {
-                "instruction": pair["question"],
-                "input": "",
-                "output": pair["answer"],
-                "product": pair["product"],
-            }
-            for pair in appended_pairs
-        ),
-    )
-    append_jsonl_records(
-        FINETUNE_CHAT_PATH,
-        (
-            {
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": pair["question"]},
-                    {"role": "assistant", "content": pair["answer"]},
-                ]
-            }
-            for pair in appended_pairs
-        ),
-    )
+    # Serialise both training formats in a single pass over the new pairs.
+    instruct_lines: list[bytes] = []
+    chat_lines: list[bytes] = []
+    for pair in appended_pairs:
+        instruct_lines.append(
+            encode_json(
+                {
+                    "instruction": pair["question"],
+                    "input": "",
+                    "output": pair["answer"],
+                    "product": pair["product"],
+                }
+            )
+        )
+        chat_lines.append(encode_chat_line(pair["question"], pair["answer"]))
+    append_jsonl_lines(FINETUNE_INSTRUCT_PATH, instruct_lines)
+    append_jsonl_lines(FINETUNE_CHAT_PATH, chat_lines)
 
     return {
         "added": len(appended_pairs),